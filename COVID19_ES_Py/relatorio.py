@@ -4,19 +4,20 @@ Nele são introduzidas as classes e métodos utilizados para coletar dados dos r
 """
 
 from functools import total_ordering
-import copy
 
 from pathlib import Path
-from io import BytesIO
+from tempfile import SpooledTemporaryFile
 import requests
-import rows
-import arrow
 
-from .utils import MUNICIPIOS, remove_caracteres_especiais, trata_dados_linha, trata_dados_linha_deprecated
+from .utils import (MUNICIPIOS, BAIRROS_NAO_ENCONTRADOS, STRING_PARA_BOOL, VALORES_IGNORADOS, carrega_linhas_csv,
+                    codifica_campos_booleanos, codifica_dicionario_booleanos, converte_data, decodifica_booleanos,
+                    le_linhas_csv, normaliza_municipio, prioriza_formato_data, trata_dados_linha)
 from .exceptions import RelatorioError
 
 # URL direta para o arquivo csv dos microdados do painel PowerBI
 URL_RELATORIO_CSV = "https://bi.static.es.gov.br/covid19/MICRODADOS.csv"
+# Tamanho máximo (em bytes) do csv baixado mantido em memória antes de ser escrito em disco
+TAMANHO_MAXIMO_CSV_MEMORIA = 16 * 1024 * 1024
 
 
 @total_ordering
@@ -34,18 +35,39 @@ class Municipio():
     nome : ``str``
         O nome do município.
     casos : ``list`` : ``Caso``
-        Uma lista de objetos do tipo Caso.
+        Uma lista de objetos do tipo Caso, criados apenas quando acessada.
+    linhas : ``list`` : ``tuple``
+        As linhas do csv referentes aos casos do município.
+    classeCaso : ``type``
+        A classe usada para criar os objetos da lista de casos (`Caso` ou `CasoDeprecated`).
     casosConfirmados : ``int``
         O número de casos confirmados no município.
     obitos : ``int``
         O número de óbitos confirmados em decorrência de COVID-19 no município.
     """
 
-    def __init__(self, nome):
+    __slots__ = ('nome', 'linhas', 'classeCaso', 'casosConfirmados', 'obitos', '_casos')
+
+    def __init__(self, nome, classeCaso=None):
         self.nome = nome
-        self.casos = []
+        self.linhas = []
+        self.classeCaso = classeCaso
         self.casosConfirmados = 0
         self.obitos = 0
+        self._casos = None
+
+    @property
+    def casos(self):
+        """A lista de objetos Caso do município, criada a partir de self.linhas no primeiro acesso."""
+
+        if self._casos is None:
+            classeCaso = self.classeCaso or Caso
+            self._casos = [classeCaso(linha) for linha in self.linhas]
+        return self._casos
+
+    @casos.setter
+    def casos(self, casos):
+        self._casos = casos
 
     # Objetos do tipo Municipio podem ser comparados alfabeticamente
     def __eq__(self, other):  # pragma: no cover
@@ -61,6 +83,12 @@ class Municipio():
         return f"{{'casosConfirmados': {self.casosConfirmados}, 'obitos': {self.obitos}}}"
 
 
+# Chaves dos dicionários de sintomas e comorbidades, na ordem das colunas do csv
+SINTOMAS = ('febre', 'dificuldadeRespiratoria', 'tosse', 'coriza', 'dorGarganta', 'diarreia', 'cefaleia')
+COMORBIDADES = ('comorbidadePulmao', 'comorbidadeCardio', 'comorbidadeRenal', 'comorbidadeDiabetes',
+                'comorbidadeTabagismo', 'comorbidadeObesidade')
+
+
 class CasoDeprecated():
     """
     Um objeto `CasoDeprecated` é capaz de abstrair o registro de um caso lido do csv no formato antigo (antes de 02/07/2020).
@@ -94,8 +122,10 @@ class CasoDeprecated():
         O grau de escolaridade do paciente ou ``None`` se não for informada.
     sintomas : ``dict`` : ``bool``
         Os sintomas apresentados pelo paciente.
+        Cada leitura retorna um novo dicionário: para alterar os sintomas, atribua um dicionário completo.
     comorbidades : ``dict`` : ``bool``
         As comorbidades apresentadas pelo paciente.
+        Cada leitura retorna um novo dicionário: para alterar as comorbidades, atribua um dicionário completo.
     ficouInternado : ``bool`` ou ``None``
         Se o paciente ficou internado ou não.
     viagemBrasil : ``bool`` ou ``None``
@@ -104,6 +134,11 @@ class CasoDeprecated():
         Se o paciente realizou viagem internacional ou não.
     """
 
+    # Sintomas e comorbidades são armazenados como máscaras de bits (veja `codifica_booleanos`)
+    __slots__ = ('data', 'classificacao', 'evolucao', 'criterioConfirmacao', 'statusNotificacao', 'municipio', 'bairro',
+                 'faixaEtaria', 'sexo', 'racaCor', 'escolaridade', '_sintomasPresentes', '_sintomasIgnorados',
+                 '_comorbidadesPresentes', '_comorbidadesIgnorados', 'ficouInternado', 'viagemBrasil', 'viagemInternacional')
+
     def __init__(self,
                  dados=None,
                  data=None,
@@ -145,44 +180,72 @@ class CasoDeprecated():
     def __str__(self):  # pragma: no cover
         return f"Caso de {self.data} - {self.classificacao} em {self.municipio}"  # pragma: no cover
 
+    @property
+    def sintomas(self):
+        """Uma cópia do dicionário de sintomas do paciente, montada a partir das máscaras de bits."""
+
+        if self._sintomasPresentes is None:
+            return None
+        return decodifica_booleanos(SINTOMAS, self._sintomasPresentes, self._sintomasIgnorados)
+
+    @sintomas.setter
+    def sintomas(self, sintomas):
+        if sintomas is None:
+            self._sintomasPresentes = self._sintomasIgnorados = None
+        else:
+            self._sintomasPresentes, self._sintomasIgnorados = codifica_dicionario_booleanos(sintomas, SINTOMAS)
+
+    @property
+    def comorbidades(self):
+        """Uma cópia do dicionário de comorbidades do paciente, montada a partir das máscaras de bits."""
+
+        if self._comorbidadesPresentes is None:
+            return None
+        return decodifica_booleanos(COMORBIDADES, self._comorbidadesPresentes, self._comorbidadesIgnorados)
+
+    @comorbidades.setter
+    def comorbidades(self, comorbidades):
+        if comorbidades is None:
+            self._comorbidadesPresentes = self._comorbidadesIgnorados = None
+        else:
+            self._comorbidadesPresentes, self._comorbidadesIgnorados = codifica_dicionario_booleanos(
+                comorbidades, COMORBIDADES)
+
+    @staticmethod
+    def colunas_agregacao(nColunas):
+        """Retorna os índices das colunas de classificação, município e evolução em uma linha do csv."""
+
+        return 1, 5, 2
+
+    @staticmethod
+    def campos_agregacao_linha(linha):
+        """Retorna a classificação, o município e a evolução de uma linha do csv sem carregar o restante dos dados."""
+
+        # Os mesmos índices de `colunas_agregacao`, fixos neste formato
+        return linha[1], linha[5], linha[2]
+
     def carrega_dados_linha(self, linha):
         """Carrega os dados presentes em uma linha do csv para o objeto Caso.
         Retorna o objeto Caso preenchido.
         """
 
-        linha = trata_dados_linha_deprecated(list(linha))
-
-        self.data = linha[0]
+        # Mesmo tratamento de `trata_dados_linha_deprecated`, atribuído diretamente da linha, sem copiá-la
+        self.data = converte_data(linha[0])
         self.classificacao = linha[1]
-        self.evolucao = linha[2]
-        self.criterioConfirmacao = linha[3]
+        self.evolucao = None if linha[2] in VALORES_IGNORADOS else linha[2]
+        self.criterioConfirmacao = None if "-" in linha[3] else linha[3]
         self.statusNotificacao = linha[4]
         self.municipio = linha[5]
-        self.bairro = linha[6]
+        self.bairro = None if linha[6] in BAIRROS_NAO_ENCONTRADOS else linha[6]
         self.faixaEtaria = linha[7]
         self.sexo = linha[8]
-        self.racaCor = linha[9]
-        self.escolaridade = linha[10]
-        self.sintomas = {
-            "febre": linha[11],
-            "dificuldadeRespiratoria": linha[12],
-            "tosse": linha[13],
-            "coriza": linha[14],
-            "dorGarganta": linha[15],
-            "diarreia": linha[16],
-            "cefaleia": linha[17],
-        }
-        self.comorbidades = {
-            "comorbidadePulmao": linha[18],
-            "comorbidadeCardio": linha[19],
-            "comorbidadeRenal": linha[20],
-            "comorbidadeDiabetes": linha[21],
-            "comorbidadeTabagismo": linha[22],
-            "comorbidadeObesidade": linha[23]
-        }
-        self.ficouInternado = linha[24]
-        self.viagemBrasil = linha[25]
-        self.viagemInternacional = linha[26]
+        self.racaCor = None if "Ignorado" in linha[9] else linha[9]
+        self.escolaridade = None if "Ignorado" in linha[10] else linha[10]
+        self._sintomasPresentes, self._sintomasIgnorados = codifica_campos_booleanos(linha, 11, 18)
+        self._comorbidadesPresentes, self._comorbidadesIgnorados = codifica_campos_booleanos(linha, 18, 24)
+        self.ficouInternado = STRING_PARA_BOOL.get(linha[24])
+        self.viagemBrasil = STRING_PARA_BOOL.get(linha[25])
+        self.viagemInternacional = STRING_PARA_BOOL.get(linha[26])
 
         return self
 
@@ -246,6 +309,11 @@ class Caso():
         Se o paciente é profissional da saúde ou não.
     """
 
+    __slots__ = ('dataNotificacao', 'dataCadastro', 'dataDiagnostico', 'dataColeta_RT_PCR', 'dataColetaTesteRapido',
+                 'dataEncerramento', 'dataObito', 'classificacao', 'evolucao', 'criterioConfirmacao', 'statusNotificacao',
+                 'municipio', 'bairro', 'faixaEtaria', 'sexo', 'racaCor', 'escolaridade', 'sintomas', 'comorbidades',
+                 'ficouInternado', 'viagemBrasil', 'viagemInternacional', 'profissionalSaude')
+
     def __init__(self,
                  dados=None,
                  dataNotificacao=None,
@@ -300,6 +368,24 @@ class Caso():
     def __str__(self):  # pragma: no cover
         return f"Caso de {self.dataNotificacao} - {self.classificacao} em {self.municipio}"  # pragma: no cover
 
+    @staticmethod
+    def colunas_agregacao(nColunas):
+        """Retorna os índices das colunas de classificação, município e evolução em uma linha do csv com `nColunas` colunas."""
+
+        volta = 3
+        if nColunas == 33:
+            volta = 2
+        elif nColunas == 34:
+            volta = 1
+        return 7 - volta, 11 - volta, 8 - volta
+
+    @classmethod
+    def campos_agregacao_linha(cls, linha):
+        """Retorna a classificação, o município e a evolução de uma linha do csv sem carregar o restante dos dados."""
+
+        iClassificacao, iMunicipio, iEvolucao = cls.colunas_agregacao(len(linha))
+        return linha[iClassificacao], linha[iMunicipio], linha[iEvolucao]
+
     def carrega_dados_linha(self, linha):
         """Carrega os dados presentes em uma linha do csv para o objeto Caso.
         Retorna o objeto Caso preenchido.
@@ -369,8 +455,8 @@ class Relatorio():
     ----------
     csv : ``str``
         A string com caminho ou URL do arquivo csv.
-    linhasRelatorio : ``list`` : ``Row``
-        A lista de objetos Row lidos do arquivo csv.
+    linhasRelatorio : ``list`` : ``tuple``
+        A lista de linhas lidas do arquivo csv (sem o cabeçalho).
     casosMunicipios : ``dict`` : ``Municipio``
         O dicionário de objetos Municipio
     importadosOuIndefinidos : ``dict`` : ``int``
@@ -384,7 +470,7 @@ class Relatorio():
     def __init__(self, caminhoCSV=None):
         if caminhoCSV:
             self.csv = Path(caminhoCSV)
-            self.linhasRelatorio = rows.import_from_csv(self.csv, encoding='Latin-1')
+            self.linhasRelatorio = carrega_linhas_csv(self.csv, colunasAgregacao=self.classe_caso().colunas_agregacao)
         else:
             self.csv = URL_RELATORIO_CSV
             self.linhasRelatorio = None
@@ -402,11 +488,11 @@ class Relatorio():
         }
         self.nMunicipiosInfectados = 0
 
-    def inicializa_dicionario_municipios(self):
+    def inicializa_dicionario_municipios(self, classeCaso=None):
         """Inicializa o dicionário de municípios do Relatorio."""
 
-        for municipio in MUNICIPIOS:
-            self.casosMunicipios[municipio] = Municipio(municipio)
+        for municipio in sorted(MUNICIPIOS):
+            self.casosMunicipios[municipio] = Municipio(municipio, classeCaso)
 
     def busca_casos_municipio(self, municipio):
         """Realiza pesquisa no Relatorio por casos registrados em um município.
@@ -426,46 +512,80 @@ class Relatorio():
         self.casos[municipio] : ``dict``
             O dicionário de casos registrados no município."""
 
-        stringMunicipioTratada = remove_caracteres_especiais(
-            municipio).upper().strip()
+        stringMunicipioTratada = normaliza_municipio(municipio)
         try:
             return self.casosMunicipios[stringMunicipioTratada]
         except KeyError:
             raise RelatorioError(
                 f"O município '{municipio}' não foi encontrado no relatório. Pode ter ocorrido um erro de digitação ou o município não é do Espírito Santo.")
 
+    def classe_caso(self):
+        """Retorna a classe que lê as linhas do relatório: `CasoDeprecated` para relatórios até 01/07/2020 e `Caso` para
+        os demais, de acordo com a data no nome do arquivo."""
+
+        if converte_data(Path(self.csv).stem) <= converte_data("01-07-2020"):
+            return CasoDeprecated
+        return Caso
+
     def popula_relatorio(self):
-        """Preenche o Relatorio com as informações presentes em self.linhasRelatorio e retorna uma cópia do Relatorio."""
+        """Preenche o Relatorio com as informações presentes em self.linhasRelatorio e retorna uma cópia do Relatorio.
 
-        self.totalGeral['casosConfirmados'] = 0
-        self.totalGeral['obitos'] = 0
-        self.inicializa_dicionario_municipios()
+        Os dicionários de municípios e totais são recriados a cada chamada, então a cópia retornada não é alterada
+        por chamadas posteriores (por exemplo, ao aplicar outro filtro de data no mesmo `LeitorRelatorio`).
+        """
+
+        classeCaso = self.classe_caso()
+
+        self.totalGeral = {
+            'casosConfirmados': 0,
+            'obitos': 0
+        }
+        self.casosMunicipios = {}
+        self.inicializa_dicionario_municipios(classeCaso)
         self.nMunicipiosInfectados = 0
-        self.importadosOuIndefinidos['casosConfirmados'] = 0
-        self.importadosOuIndefinidos['obitos'] = 0
+        self.importadosOuIndefinidos = {
+            'casosConfirmados': 0,
+            'obitos': 0
+        }
 
+        # Os objetos Caso só são criados se a lista de casos de um município for acessada
+        casosMunicipios = self.casosMunicipios
+        importadosOuIndefinidos = self.importadosOuIndefinidos
+        # Nome do município como aparece no csv -> objeto Municipio (ou None, se não for do ES)
+        municipiosLinhas = {}
         for linha in self.linhasRelatorio:
-            if arrow.get(Path(self.csv).stem, ["DD-MM-YYYY", "DD_MM_YYYY"]) <= arrow.get('01-07-2020', ["DD-MM-YYYY", "DD_MM_YYYY"]):
-                caso = CasoDeprecated(linha)
+            classificacao, municipio, evolucao = classeCaso.campos_agregacao_linha(linha)
+
+            # Comparações simples primeiro; a normalização do nome do município é a etapa mais cara
+            if classificacao != "Confirmados":
+                continue
+            obito = evolucao == "Óbito pelo COVID-19"
+
+            if municipio not in municipiosLinhas:
+                municipiosLinhas[municipio] = casosMunicipios.get(normaliza_municipio(municipio))
+            municipioRelatorio = municipiosLinhas[municipio]
+            if municipioRelatorio is not None:
+                municipioRelatorio.linhas.append(linha)
+                if obito:
+                    municipioRelatorio.obitos += 1
             else:
-                caso = Caso(linha)
-
-            if remove_caracteres_especiais(caso.municipio.upper()) in MUNICIPIOS:
-                if self.casosMunicipios[caso.municipio].casosConfirmados == 0:
-                    self.nMunicipiosInfectados += 1
-                if (caso.evolucao == "Óbito pelo COVID-19"):
-                    self.totalGeral['obitos'] += 1
-                    self.casosMunicipios[caso.municipio].obitos += 1
-                self.casosMunicipios[caso.municipio].casos.append(caso)
-                self.casosMunicipios[caso.municipio].casosConfirmados += 1
-            else:
-                self.importadosOuIndefinidos['casosConfirmados'] += 1
-                if (caso.evolucao == "Óbito pelo COVID-19"):
-                    self.totalGeral['obitos'] += 1
-                    self.importadosOuIndefinidos['obitos'] += 1
-
-            self.totalGeral['casosConfirmados'] += 1
-        return copy.copy(self)
+                importadosOuIndefinidos['casosConfirmados'] += 1
+                if obito:
+                    importadosOuIndefinidos['obitos'] += 1
+
+        # Os totais são calculados uma única vez a partir das contagens de cada município
+        self.totalGeral['casosConfirmados'] = importadosOuIndefinidos['casosConfirmados']
+        self.totalGeral['obitos'] = importadosOuIndefinidos['obitos']
+        for municipioRelatorio in casosMunicipios.values():
+            municipioRelatorio.casosConfirmados = len(municipioRelatorio.linhas)
+            if municipioRelatorio.casosConfirmados > 0:
+                self.nMunicipiosInfectados += 1
+            self.totalGeral['casosConfirmados'] += municipioRelatorio.casosConfirmados
+            self.totalGeral['obitos'] += municipioRelatorio.obitos
+
+        copia = type(self).__new__(type(self))
+        copia.__dict__.update(self.__dict__)
+        return copia
 
     def __str__(self):
         return f"Relatório do arquivo {self.csv}:\nTotal geral: {self.totalGeral}\n{self.nMunicipiosInfectados} municípios com casos confirmados."
@@ -484,34 +604,61 @@ class LeitorRelatorio():
     ----------
     csv : ``str``
         A string com caminho ou URL do arquivo csv.
-    linhasRelatorio : ``list`` : ``Row``
-        A lista de objetos Row lidos do arquivo csv.
+    linhasRelatorio : ``list`` : ``tuple``
+        A lista de linhas lidas do arquivo csv (sem o cabeçalho).
     relatorio : ``Relatorio``
         O objeto Relatorio criado a partir do csv
         O número de municípios infectados deste relatório.
     """
 
     def __init__(self, caminhoCSV=None):
-        self.relatorio = Relatorio()
+        self.relatorio = Relatorio(caminhoCSV)
+        self.csv = self.relatorio.csv
         if caminhoCSV:
-            self.csv = Path(caminhoCSV)
-            self.linhasRelatorio = rows.import_from_csv(self.csv, encoding='Latin-1')
-            self.relatorio.csv = self.csv
-            self.relatorio.linhasRelatorio = self.linhasRelatorio
+            self.linhasRelatorio = self.relatorio.linhasRelatorio
             self.relatorio.popula_relatorio()
-        else:
-            self.csv = URL_RELATORIO_CSV
 
     def carrega_ultimo_relatorio(self):
         """Baixa e lê o arquivo csv mais recente do PowerBI."""
 
         self.relatorio.csv = URL_RELATORIO_CSV
-        self.linhasRelatorio = rows.import_from_csv(
-            BytesIO(requests.get(self.relatorio.csv).content), encoding='Latin-1')
+        # O csv é lido em partes da conexão; a leitura precisa de um arquivo com seek() para detectar o delimitador.
+        # O texto já decodificado é gravado em UTF-8, que representa qualquer caractere, independente do locale
+        with requests.get(self.relatorio.csv, stream=True) as resposta:
+            resposta.encoding = 'Latin-1'
+            with SpooledTemporaryFile(max_size=TAMANHO_MAXIMO_CSV_MEMORIA, mode="w+", encoding="utf-8",
+                                      newline="") as arquivoCSV:
+                for trecho in resposta.iter_content(chunk_size=65536, decode_unicode=True):
+                    arquivoCSV.write(trecho)
+                arquivoCSV.seek(0)
+                # O csv do PowerBI está sempre no formato atual
+                self.linhasRelatorio = le_linhas_csv(arquivoCSV, colunasAgregacao=Caso.colunas_agregacao)
         self.relatorio.linhasRelatorio = self.linhasRelatorio
 
         return self.relatorio.popula_relatorio()
 
+    def filtra_linhas_por_data(self, condicao):
+        """Filtra as linhas do relatório pela data de cada caso.
+
+        A condição é avaliada uma única vez para cada data distinta do relatório; as linhas são então selecionadas
+        consultando o resultado pela string da data.
+
+        Parameters
+        ----------
+        condicao : ``callable``
+            Função que recebe a data de um caso (objeto `arrow`) e retorna se o caso deve ser mantido.
+
+        Returns
+        ----------
+        linhas : ``list`` : ``tuple``
+            As linhas do relatório cuja data satisfaz a condição.
+        """
+
+        formatos = prioriza_formato_data(self.linhasRelatorio[0][0])
+        datas = {caso[0] for caso in self.linhasRelatorio}
+        datasAceitas = {dataCaso for dataCaso in datas if condicao(converte_data(dataCaso, formatos))}
+        return [caso for caso in self.linhasRelatorio if caso[0] in datasAceitas]
+
     def filtra_casos_ate_dia(self, data):
         """Filtra relatório por casos até o dia fornecido (incluso).
 
@@ -529,17 +676,8 @@ class LeitorRelatorio():
         """
 
         if self.relatorio.linhasRelatorio:
-            dataArrow = arrow.get(
-                data, ["DD/MM/YYYY", "DD-MM-YYYY", "DD_MM_YYYY", "DD.MM.YYYY", "DDMMYYYY"]
-            )
-            try:
-                self.relatorio.linhasRelatorio = [
-                    caso for caso in self.linhasRelatorio[1:] if dataArrow >= arrow.get(caso[0], ["DD/MM/YYYY", "DD-MM-YYYY", "DD_MM_YYYY", "DD.MM.YYYY", "DDMMYYYY", "YYYY-MM-DD"])
-                ]
-            except TypeError:
-                self.relatorio.linhasRelatorio = [
-                    caso for caso in self.linhasRelatorio[1:] if dataArrow >= arrow.get(caso[0])
-                ]
+            dataArrow = converte_data(data)
+            self.relatorio.linhasRelatorio = self.filtra_linhas_por_data(lambda dataCaso: dataArrow >= dataCaso)
             return self.relatorio.popula_relatorio()
         else:
             raise RelatorioError(
@@ -562,12 +700,8 @@ class LeitorRelatorio():
         """
 
         if self.relatorio.linhasRelatorio:
-            dataArrow = arrow.get(
-                data, ["DD/MM/YYYY", "DD-MM-YYYY", "DD_MM_YYYY", "DD.MM.YYYY", "DDMMYYYY"]
-            )
-            self.relatorio.linhasRelatorio = [
-                caso for caso in self.linhasRelatorio[1:] if dataArrow == arrow.get(caso[0], ["DD/MM/YYYY", "DD-MM-YYYY", "DD_MM_YYYY", "DD.MM.YYYY", "DDMMYYYY"])
-            ]
+            dataArrow = converte_data(data)
+            self.relatorio.linhasRelatorio = self.filtra_linhas_por_data(lambda dataCaso: dataArrow == dataCaso)
             return self.relatorio.popula_relatorio()
         else:
             raise RelatorioError(
@@ -1,11 +1,23 @@
 """O módulo `utils.py` contém funções e constantes auxiliares."""
 
+from functools import lru_cache
+from pathlib import Path
+import csv
+import sys
 import unicodedata
 import re
 import arrow
 
+from .exceptions import RelatorioError
 
-MUNICIPIOS = [
+
+# Formatos de data aceitos nos filtros e nos relatórios antigos (antes de 02/07/2020)
+FORMATOS_DATA = ("DD/MM/YYYY", "DD-MM-YYYY", "DD_MM_YYYY", "DD.MM.YYYY", "DDMMYYYY", "YYYY-MM-DD")
+# Formatos de data usados nos relatórios a partir de 02/07/2020
+FORMATOS_DATA_ISO = ("YYYY/MM/DD", "YYYY-MM-DD", "YYYY_MM_DD", "YYYY.MM.DD", "YYYYMMDD")
+
+
+MUNICIPIOS = frozenset([
     'AFONSO CLAUDIO',
     'AGUIA BRANCA',
     'AGUA DOCE DO NORTE',
@@ -84,41 +96,223 @@ MUNICIPIOS = [
     'VILA VALERIO',
     'VILA VELHA',
     'VITORIA'
-]
+])
 
+# Número de caracteres lidos do início do csv para detectar o delimitador
+TAMANHO_AMOSTRA_CSV = 262144
+# Colunas lidas por `campos_agregacao_linha`, na ordem dos índices retornados por `colunas_agregacao`
+COLUNAS_AGREGACAO = ("Classificacao", "Municipio", "Evolucao")
 
-def trata_dados_linha_deprecated(linha):
-    """ Trata e corrige os valores das linhas dos arquivos csv de relatórios de antes de 02/07/2020."""
+# Valores de campos de texto tratados como não informados
+VALORES_IGNORADOS = frozenset(["Ignorado", "-"])
+BAIRROS_NAO_ENCONTRADOS = frozenset(["Não encontrado", "NULL"])
 
-    try:
-        linha[0] = arrow.get(linha[0])
-    except arrow.ParserError:
-        linha[0] = arrow.get(linha[0], ["DD/MM/YYYY", "DD-MM-YYYY",
-                                        "DD_MM_YYYY", "DD.MM.YYYY", "DDMMYYYY"])
-
-    if linha[2] in ["Ignorado", "-"]:
-        linha[2] = None
-    if "-" in linha[3]:
-        linha[3] = None
-    if linha[6] in ["Não encontrado", "NULL"]:
-        linha[6] = None
-    if "Ignorado" in linha[9]:
-        linha[9] = None
-    if "Ignorado" in linha[10]:
-        linha[10] = None
-
-    stringParaBool = {
-        "Sim": True,
-        "Não": False,
-        "-": None,
-        "": None,
-        1: True,
-        2: None,
+# Conversão dos campos de sintomas, comorbidades, internação e viagens para booleanos
+# Valores ausentes deste dicionário são convertidos para None
+STRING_PARA_BOOL = {
+    "Sim": True,
+    "Não": False,
+    "Ignorado": None,
+    "Não Informado": None,
+    "-": None,
+    "": None,
+    "1": True,
+    "2": None,
+    1: True,
+    2: None,
+}
+
+
+@lru_cache(maxsize=4096)
+def converte_data(data, formatos=FORMATOS_DATA):
+    """Converte uma data (string ou objeto `date`/`datetime`) em um objeto `arrow`.
+
+    O resultado é memorizado, de forma que cada data distinta de um relatório é interpretada apenas uma vez.
+    """
+
+    if isinstance(data, str):
+        return arrow.get(data, list(formatos))
+    return arrow.get(data)
+
+
+def prioriza_formato_data(amostra, formatos=FORMATOS_DATA):
+    """Reordena `formatos` colocando em primeiro lugar o formato que interpreta a data `amostra`.
+
+    As datas de um mesmo relatório seguem um único formato; assim, `arrow` acerta o formato na primeira tentativa.
+    """
+
+    if isinstance(amostra, str):
+        for formato in formatos:
+            try:
+                arrow.get(amostra, formato)
+            except (arrow.ParserError, ValueError):
+                continue
+            return (formato,) + tuple(f for f in formatos if f != formato)
+    return formatos
+
+
+def codifica_booleanos(valores):
+    """Codifica uma sequência de valores ``True``/``False``/``None`` em dois inteiros.
+
+    O bit `i` de `presentes` indica se o i-ésimo valor é ``True``; o de `ignorados`, se é ``None``.
+    """
+
+    presentes = 0
+    ignorados = 0
+    for i, valor in enumerate(valores):
+        if valor is None:
+            ignorados |= 1 << i
+        elif valor:
+            presentes |= 1 << i
+    return presentes, ignorados
+
+
+def codifica_campos_booleanos(linha, inicio, fim):
+    """Codifica como `codifica_booleanos` os campos `linha[inicio:fim]` do csv, convertidos por `STRING_PARA_BOOL`.
+
+    Os campos são lidos diretamente da linha, sem criar uma cópia do trecho.
+    """
+
+    presentes = 0
+    ignorados = 0
+    for i in range(inicio, fim):
+        valor = STRING_PARA_BOOL.get(linha[i])
+        if valor is None:
+            ignorados |= 1 << (i - inicio)
+        elif valor:
+            presentes |= 1 << (i - inicio)
+    return presentes, ignorados
+
+
+def codifica_dicionario_booleanos(dicionario, chaves):
+    """Codifica com `codifica_booleanos` os valores de `dicionario` na ordem de `chaves`.
+
+    Valores que não são ``bool`` nem ``None`` (como "Sim" e "Não") são convertidos por `STRING_PARA_BOOL`;
+    chaves ausentes são tratadas como ``None``.
+
+    Raises
+    ----------
+    `ValueError`
+        Se o dicionário possuir chaves que não estão em `chaves`.
+    """
+
+    chavesInvalidas = set(dicionario) - set(chaves)
+    if chavesInvalidas:
+        raise ValueError(f"Chaves inválidas: {', '.join(sorted(map(str, chavesInvalidas)))}.")
+
+    valores = (dicionario.get(chave) for chave in chaves)
+    return codifica_booleanos(
+        valor if valor is None or isinstance(valor, bool) else STRING_PARA_BOOL.get(valor) for valor in valores)
+
+
+def decodifica_booleanos(chaves, presentes, ignorados):
+    """Reconstrói o dicionário de valores codificados por `codifica_booleanos`."""
+
+    return {
+        chave: None if ignorados >> i & 1 else bool(presentes >> i & 1)
+        for i, chave in enumerate(chaves)
     }
-    for i, campo in enumerate(linha[11:]):
-        linha[i + 11] = stringParaBool.get(linha[i + 11], None)
 
-    return linha
+
+def le_linhas_csv(arquivo, encoding="Latin-1", colunasAgregacao=None):
+    """Lê as linhas de um arquivo csv, descartando o cabeçalho.
+
+    Parameters
+    ----------
+    arquivo : ``str``, ``Path`` ou arquivo de texto
+        O caminho até o arquivo csv ou um arquivo já aberto em modo texto (com suporte a `seek`).
+    encoding : ``str``
+        A codificação do arquivo, usada apenas se um caminho for informado.
+    colunasAgregacao : ``callable``
+        Função que recebe o número de colunas do cabeçalho e retorna os índices das colunas `COLUNAS_AGREGACAO`
+        (`colunas_agregacao` de `Caso` ou `CasoDeprecated`). Se não for informada, o cabeçalho não é verificado.
+
+    Raises
+    ----------
+    `RelatorioError`
+        Se o cabeçalho não tiver as colunas `COLUNAS_AGREGACAO` nos índices retornados por `colunasAgregacao`.
+
+    Returns
+    ----------
+    linhas : ``list`` : ``tuple``
+        As linhas do csv, com todos os campos como ``str``.
+    """
+
+    if hasattr(arquivo, "read"):
+        return _le_linhas_arquivo_csv(arquivo, colunasAgregacao)
+    with open(arquivo, encoding=encoding, newline="") as arquivoCSV:
+        return _le_linhas_arquivo_csv(arquivoCSV, colunasAgregacao)
+
+
+def _le_linhas_arquivo_csv(arquivoCSV, colunasAgregacao):
+    amostra = arquivoCSV.read(TAMANHO_AMOSTRA_CSV)
+    arquivoCSV.seek(0)
+    try:
+        dialeto = csv.Sniffer().sniff(amostra, delimiters=",;\t|")
+    except csv.Error:
+        dialeto = csv.excel
+
+    # Os campos se repetem muito entre as linhas ("Sim", "Não", "Confirmados", municípios...), então são internados
+    # para que todas as linhas compartilhem os mesmos objetos str
+    leitor = csv.reader(arquivoCSV, dialeto)
+    cabecalho = next(leitor, None)
+    if cabecalho is not None and colunasAgregacao is not None:
+        _verifica_cabecalho(cabecalho, colunasAgregacao(len(cabecalho)))
+    return [tuple(map(sys.intern, linha)) for linha in leitor if linha]
+
+
+def _verifica_cabecalho(cabecalho, indices):
+    # Os nomes são comparados sem acentos e sem diferenciar maiúsculas
+    encontradas = tuple(cabecalho[i] if i < len(cabecalho) else None for i in indices)
+    if any(nome is None or remove_caracteres_especiais(nome).strip().lower() != esperado.lower()
+           for nome, esperado in zip(encontradas, COLUNAS_AGREGACAO)):
+        raise RelatorioError(
+            f"Formato de csv não reconhecido: esperadas as colunas {COLUNAS_AGREGACAO} nos índices {tuple(indices)}, "
+            f"encontradas {encontradas}.")
+
+
+def carrega_linhas_csv(caminho, encoding="Latin-1", colunasAgregacao=None):
+    """Lê as linhas de um arquivo csv com `le_linhas_csv`, reaproveitando leituras anteriores do mesmo arquivo.
+
+    O arquivo é lido novamente se tiver sido modificado desde a última leitura. `encoding` e `colunasAgregacao` são
+    repassados para `le_linhas_csv`.
+
+    Returns
+    ----------
+    linhas : ``list`` : ``tuple``
+        Uma nova lista com as linhas do csv.
+    """
+
+    caminho = Path(caminho).resolve()
+    return list(_carrega_linhas_csv(str(caminho), caminho.stat().st_mtime_ns, encoding, colunasAgregacao))
+
+
+@lru_cache(maxsize=4)
+def _carrega_linhas_csv(caminho, modificacao, encoding, colunasAgregacao):
+    return tuple(le_linhas_csv(caminho, encoding, colunasAgregacao))
+
+
+def trata_dados_linha_deprecated(linha):
+    """ Trata e corrige os valores das linhas dos arquivos csv de relatórios de antes de 02/07/2020.
+
+    Retorna uma nova lista com os valores tratados; a linha recebida não é alterada. `CasoDeprecated` aplica o mesmo
+    tratamento, com as mesmas constantes, ao atribuir cada campo diretamente da linha.
+    """
+
+    return [
+        converte_data(linha[0]),
+        linha[1],
+        None if linha[2] in VALORES_IGNORADOS else linha[2],
+        None if "-" in linha[3] else linha[3],
+        linha[4],
+        linha[5],
+        None if linha[6] in BAIRROS_NAO_ENCONTRADOS else linha[6],
+        linha[7],
+        linha[8],
+        None if "Ignorado" in linha[9] else linha[9],
+        None if "Ignorado" in linha[10] else linha[10],
+        *(STRING_PARA_BOOL.get(campo) for campo in linha[11:])
+    ]
 
 
 def trata_dados_linha(linha):
@@ -126,29 +320,18 @@ def trata_dados_linha(linha):
 
     for i in range(0, 6):
         try:
-            linha[i] = arrow.get(linha[i], ["YYYY/MM/DD", "YYYY-MM-DD",
-                                            "YYYY_MM_DD", "YYYY.MM.DD", "YYYYMMDD"])
+            linha[i] = converte_data(linha[i], FORMATOS_DATA_ISO)
         except arrow.ParserError:
             pass
 
     for i in range(5, 17):
-        if linha[i] in ["Ignorado", "-"]:
+        if linha[i] in VALORES_IGNORADOS:
             linha[i] = None
     if "Não Encontrado" in linha[12]:
         linha[12] = None
 
-    stringParaBool = {
-        "Sim": True,
-        "Não": False,
-        "Ignorado": None,
-        "Não Informado"
-        "-": None,
-        "": None,
-        1: True,
-        2: None,
-    }
-    for i, campo in enumerate(linha[15:]):
-        linha[i + 15] = stringParaBool.get(linha[i + 15], None)
+    for i in range(15, len(linha)):
+        linha[i] = STRING_PARA_BOOL.get(linha[i])
 
     return linha
 
@@ -158,3 +341,13 @@ def remove_caracteres_especiais(stringEntrada):
 
     formaNFKD = unicodedata.normalize('NFKD', stringEntrada)
     return u"".join([c for c in formaNFKD if not unicodedata.combining(c)])
+
+
+@lru_cache(maxsize=1024)
+def normaliza_municipio(municipio):
+    """Converte o nome de um município para a forma usada em `MUNICIPIOS` (maiúsculas, sem acentos e espaços nas pontas).
+
+    Com o resultado memorizado, cada nome distinto do csv é tratado apenas uma vez.
+    """
+
+    return remove_caracteres_especiais(municipio).upper().strip()
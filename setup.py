@@ -51,6 +51,5 @@ setup(
         "wcwidth==0.1.9",
         "wrapt==1.12.1",
         "zipp==3.1.0",
-        "rows"
     ],
 )
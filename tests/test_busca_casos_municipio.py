@@ -63,6 +63,16 @@ def test_03_04():
     assert(relatorio.busca_casos_municipio("vILA pavao").obitos == 0)
 
 
+def test_17_04():
+    # Relatório com casos suspeitos, que não devem ser contados como confirmados
+    relatorio = Relatorio(
+        Path("tests/relatorios_passados/17-04-2020.csv"))
+    relatorio.popula_relatorio()
+
+    assert(relatorio.busca_casos_municipio("Vitória").casosConfirmados == 209)
+    assert(relatorio.totalGeral['casosConfirmados'] == 952)
+
+
 def test_fail_21_04():
     relatorio = Relatorio(Path("tests/relatorios_passados/21-04-2020.csv"))
 
@@ -77,3 +87,38 @@ def test_fail_21_04():
     # Tipo incorreto de parâmetro
     with pytest.raises(TypeError):
         relatorio.busca_casos_municipio(1)
+
+
+def test_casos_30_04():
+    relatorio = Relatorio(
+        Path("tests/relatorios_passados/30-04-2020.csv"))
+    relatorio.popula_relatorio()
+
+    municipio = relatorio.busca_casos_municipio("Vitória")
+    assert(len(municipio.casos) == 554)
+    assert(all(caso.municipio == "VITORIA" for caso in municipio.casos))
+    assert(len([caso for caso in municipio.casos if caso.evolucao == "Óbito pelo COVID-19"]) == 16)
+
+    assert(relatorio.busca_casos_municipio("vILA pavao").casos == [])
+
+    # A lista criada no primeiro acesso pode ser alterada ou substituída
+    municipio.casos.append(municipio.casos[0])
+    assert(len(municipio.casos) == 555)
+    municipio.casos = []
+    assert(municipio.casos == [])
+
+
+def test_municipio_com_acentos():
+    relatorio = Relatorio()
+    relatorio.csv = Path("tests/relatorios_passados/30-04-2020.csv")
+    relatorio.linhasRelatorio = [
+        ["28/04/2020", "Confirmados", "-", "Laboratorial", "Em Aberto", "Vitória", "CENTRO", "70 a 79 anos", "F", "Branca",
+         "Analfabeto", "Não", "Sim", "Sim", "Não", "Não", "Não", "Sim", "Sim", "Sim", "Não", "Não", "Sim", "Não", "Sim", "Não", "Não"],
+        ["28/04/2020", "Confirmados", "Óbito pelo COVID-19", "Laboratorial", "Encerrado", "VITORIA", "CENTRO", "70 a 79 anos", "F", "Branca",
+         "Analfabeto", "Não", "Sim", "Sim", "Não", "Não", "Não", "Sim", "Sim", "Sim", "Não", "Não", "Sim", "Não", "Sim", "Não", "Não"],
+    ]
+    relatorio.popula_relatorio()
+
+    assert(relatorio.busca_casos_municipio("Vitória").casosConfirmados == 2)
+    assert(relatorio.busca_casos_municipio("Vitória").obitos == 1)
+    assert(relatorio.importadosOuIndefinidos['casosConfirmados'] == 0)
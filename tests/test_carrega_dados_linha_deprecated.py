@@ -91,3 +91,34 @@ def test_fail():
         caso.carrega_dados_linha(False)
     with pytest.raises(TypeError):
         caso.carrega_dados_linha(None)
+
+
+def test_construtor():
+    caso = CasoDeprecated(sintomas={"febre": True, "tosse": "Não", "coriza": "Sim", "cefaleia": "-"},
+                          comorbidades={"comorbidadeRenal": False})
+    assert caso.sintomas == {
+        "febre": True,
+        "dificuldadeRespiratoria": None,
+        "tosse": False,
+        "coriza": True,
+        "dorGarganta": None,
+        "diarreia": None,
+        "cefaleia": None
+    }
+    assert caso.comorbidades == {
+        "comorbidadePulmao": None,
+        "comorbidadeCardio": None,
+        "comorbidadeRenal": False,
+        "comorbidadeDiabetes": None,
+        "comorbidadeTabagismo": None,
+        "comorbidadeObesidade": None
+    }
+
+    caso = CasoDeprecated()
+    assert caso.sintomas is None
+    assert caso.comorbidades is None
+
+    with pytest.raises(ValueError):
+        CasoDeprecated(sintomas={"febr": True})
+    with pytest.raises(ValueError):
+        CasoDeprecated(comorbidades={"febre": True})
@@ -0,0 +1,26 @@
+import os
+import shutil
+from pathlib import Path
+
+from COVID19_ES_Py.utils import carrega_linhas_csv, le_linhas_csv
+
+
+def test_success(tmp_path):
+    caminho = Path("tests/relatorios_passados/21-04-2020.csv")
+    linhas = carrega_linhas_csv(caminho)
+    assert linhas == le_linhas_csv(caminho)
+
+    # Uma nova lista a cada chamada, com as mesmas linhas lidas anteriormente
+    novasLinhas = carrega_linhas_csv(caminho)
+    assert novasLinhas == linhas
+    assert novasLinhas is not linhas
+    assert novasLinhas[0] is linhas[0]
+
+    # Arquivo modificado é lido novamente
+    copia = tmp_path / "21-04-2020.csv"
+    shutil.copy(caminho, copia)
+    assert len(carrega_linhas_csv(copia)) == len(linhas)
+    with open(copia, "a", encoding="Latin-1") as arquivo:
+        arquivo.write(";".join(["21/04/2020", "Confirmados"] + ["-"] * 25) + "\n")
+    os.utime(copia, ns=(0, os.stat(copia).st_mtime_ns + 1))
+    assert len(carrega_linhas_csv(copia)) == len(linhas) + 1
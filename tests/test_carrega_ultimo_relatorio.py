@@ -0,0 +1,58 @@
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+import requests
+
+from COVID19_ES_Py import LeitorRelatorio, Relatorio, exceptions
+from COVID19_ES_Py import relatorio as moduloRelatorio
+from COVID19_ES_Py.utils import le_linhas_csv
+
+# Cabeçalho com Classificacao, Evolucao e Municipio nas colunas lidas por `Caso` em linhas de 31 colunas
+CABECALHO = ["DataNotificacao", "DataCadastro", "DataDiagnostico", "DataColeta_RT_PCR", "Classificacao", "Evolucao",
+             "CriterioConfirmacao", "StatusNotificacao", "Municipio"] + [f"Coluna{i}" for i in range(9, 31)]
+
+
+def simula_download(monkeypatch, conteudo):
+    def get(url, stream=False):
+        assert url == moduloRelatorio.URL_RELATORIO_CSV
+        resposta = requests.Response()
+        resposta.status_code = 200
+        resposta.raw = BytesIO(conteudo)
+        return resposta
+
+    monkeypatch.setattr(requests, "get", get)
+    # Força a escrita do csv baixado em disco
+    monkeypatch.setattr(moduloRelatorio, "TAMANHO_MAXIMO_CSV_MEMORIA", 1024)
+    # O nome do arquivo baixado não contém a data do relatório; apenas a leitura do csv é verificada
+    monkeypatch.setattr(Relatorio, "popula_relatorio", lambda self: self)
+
+
+def test_success(tmp_path, monkeypatch):
+    linhas = [CABECALHO] + [
+        ["2020-07-10"] * 4 + ["Confirmados", "-", "Laboratorial", "Em Aberto", "VITÓRIA"] + ["Não"] * 22
+    ] * 100
+    # Byte entre 0x80 e 0x9F (caractere de controle C1 em Latin-1)
+    linhas.append(["2020-07-10"] * 4 + ["Confirmados", "\x85", "-", "-", "SERRA"] + ["-"] * 22)
+    conteudo = "".join(";".join(linha) + "\r\n" for linha in linhas).encode("Latin-1")
+    caminho = tmp_path / "MICRODADOS.csv"
+    caminho.write_bytes(conteudo)
+    simula_download(monkeypatch, conteudo)
+
+    leitor = LeitorRelatorio()
+    relatorio = leitor.carrega_ultimo_relatorio()
+
+    assert relatorio.csv == moduloRelatorio.URL_RELATORIO_CSV
+    assert leitor.linhasRelatorio == le_linhas_csv(caminho)
+    assert relatorio.linhasRelatorio is leitor.linhasRelatorio
+    assert len(leitor.linhasRelatorio) == 101
+    assert leitor.linhasRelatorio[0][8] == "VITÓRIA"
+    assert leitor.linhasRelatorio[-1][5] == "\x85"
+
+
+def test_fail(monkeypatch):
+    # Relatório em formato antigo no lugar do csv atual
+    simula_download(monkeypatch, Path("tests/relatorios_passados/30-04-2020.csv").read_bytes())
+
+    with pytest.raises(exceptions.RelatorioError):
+        LeitorRelatorio().carrega_ultimo_relatorio()
@@ -0,0 +1,39 @@
+import pytest
+
+from COVID19_ES_Py.utils import (codifica_booleanos, codifica_campos_booleanos, codifica_dicionario_booleanos,
+                                 decodifica_booleanos)
+
+
+def test_success():
+    assert codifica_booleanos([]) == (0, 0)
+    assert codifica_booleanos([True, False, None]) == (0b001, 0b100)
+    assert codifica_booleanos([None, True, True, False]) == (0b0110, 0b0001)
+
+    chaves = ("febre", "tosse", "coriza", "cefaleia")
+    valores = [None, True, True, False]
+    assert decodifica_booleanos(chaves, *codifica_booleanos(valores)) == dict(zip(chaves, valores))
+    assert decodifica_booleanos((), 0, 0) == {}
+
+
+def test_fail():
+    with pytest.raises(TypeError):
+        codifica_booleanos(None)
+    with pytest.raises(TypeError):
+        decodifica_booleanos(None, 0, 0)
+
+
+def test_dicionario():
+    chaves = ("febre", "tosse", "coriza")
+    assert codifica_dicionario_booleanos({}, chaves) == (0, 0b111)
+    assert codifica_dicionario_booleanos({"febre": "Não", "tosse": "Sim", "coriza": True}, chaves) == (0b110, 0)
+    with pytest.raises(ValueError):
+        codifica_dicionario_booleanos({"diarreia": True}, chaves)
+
+
+def test_campos():
+    linha = ("17/04/2020", "Sim", "Não", "-", "Sim", "Ignorado")
+    assert codifica_campos_booleanos(linha, 1, 6) == codifica_booleanos([True, False, None, True, None])
+    assert codifica_campos_booleanos(linha, 1, 6) == (0b01001, 0b10100)
+    assert codifica_campos_booleanos(linha, 2, 2) == (0, 0)
+    with pytest.raises(IndexError):
+        codifica_campos_booleanos(linha, 1, 7)
@@ -0,0 +1,28 @@
+from datetime import date
+import pytest
+import arrow
+
+from COVID19_ES_Py.utils import converte_data, FORMATOS_DATA_ISO
+
+
+def test_success():
+    assert converte_data("24/04/2020") == arrow.get("24/04/2020", "DD/MM/YYYY")
+    assert converte_data("24-04-2020") == arrow.get("24/04/2020", "DD/MM/YYYY")
+    assert converte_data("24_04_2020") == arrow.get("24/04/2020", "DD/MM/YYYY")
+    assert converte_data("24.04.2020") == arrow.get("24/04/2020", "DD/MM/YYYY")
+    assert converte_data("24042020") == arrow.get("24/04/2020", "DD/MM/YYYY")
+    assert converte_data("2020-04-24") == arrow.get("24/04/2020", "DD/MM/YYYY")
+    assert converte_data(date(2020, 4, 24)) == arrow.get("24/04/2020", "DD/MM/YYYY")
+    assert converte_data("2020/04/24", FORMATOS_DATA_ISO) == arrow.get("24/04/2020", "DD/MM/YYYY")
+
+    # Datas iguais são interpretadas apenas uma vez
+    assert converte_data("25/04/2020") is converte_data("25/04/2020")
+
+
+def test_fail():
+    with pytest.raises(arrow.parser.ParserError):
+        converte_data("")
+    with pytest.raises(arrow.parser.ParserError):
+        converte_data("abc")
+    with pytest.raises(TypeError):
+        converte_data(["24/04/2020"])
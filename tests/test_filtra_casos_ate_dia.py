@@ -9,7 +9,7 @@ def test_02_05():
     assert(relatorio.busca_casos_municipio("Vitória").casosConfirmados == 621)
     assert(relatorio.busca_casos_municipio("Vitória").obitos == 18)
 
-    assert(relatorio.busca_casos_municipio("  santa teresa ").casosConfirmados == 16)
+    assert(relatorio.busca_casos_municipio("  santa teresa ").casosConfirmados == 17)
     assert(relatorio.busca_casos_municipio("  santa teresa ").obitos == 0)
 
     assert(relatorio.busca_casos_municipio("AFONSO CLAUDIO").casosConfirmados == 11)
@@ -26,7 +26,7 @@ def test_03_05():
     assert(relatorio.busca_casos_municipio("Vitória").casosConfirmados == 628)
     assert(relatorio.busca_casos_municipio("Vitória").obitos == 20)
 
-    assert(relatorio.busca_casos_municipio("  santa teresa ").casosConfirmados == 16)
+    assert(relatorio.busca_casos_municipio("  santa teresa ").casosConfirmados == 17)
     assert(relatorio.busca_casos_municipio("  santa teresa ").obitos == 0)
 
     assert(relatorio.busca_casos_municipio("AFONSO CLAUDIO").casosConfirmados == 13)
@@ -34,3 +34,11 @@ def test_03_05():
 
     assert(relatorio.busca_casos_municipio("vILA pavao").obitos == 0)
     assert(relatorio.busca_casos_municipio("vILA pavao").obitos == 0)
+
+
+def test_filtra_linhas_por_data():
+    leitor = LeitorRelatorio(Path("tests/relatorios_passados/03-05-2020.csv"))
+
+    assert(leitor.filtra_linhas_por_data(lambda data: False) == [])
+    assert(leitor.filtra_linhas_por_data(lambda data: True) == leitor.linhasRelatorio)
+    assert(all(linha[0] == "2020-04-28" for linha in leitor.filtra_linhas_por_data(lambda data: (data.month, data.day) == (4, 28))))
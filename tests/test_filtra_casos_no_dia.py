@@ -1,5 +1,5 @@
 from pathlib import Path
-from COVID19_ES_Py import LeitorRelatorio
+from COVID19_ES_Py import LeitorRelatorio, Relatorio
 
 
 def test_22_04():
@@ -34,3 +34,21 @@ def test_21_04():
 
     assert(relatorio.busca_casos_municipio("vILA pavao").obitos == 0)
     assert(relatorio.busca_casos_municipio("vILA pavao").obitos == 0)
+
+
+def test_filtros_independentes():
+    leitor = LeitorRelatorio(Path("tests/relatorios_passados/22-04-2020.csv"))
+    relatorio22 = leitor.filtra_casos_no_dia("22/04/2020")
+    relatorio21 = leitor.filtra_casos_no_dia("21/04/2020")
+
+    # Filtrar novamente não altera o relatório retornado anteriormente
+    assert(relatorio22.busca_casos_municipio("Vitória").casosConfirmados == 2)
+    assert(relatorio22.totalGeral != relatorio21.totalGeral)
+
+
+def test_subclasse_relatorio():
+    class RelatorioFilho(Relatorio):
+        pass
+
+    relatorio = RelatorioFilho(Path("tests/relatorios_passados/22-04-2020.csv"))
+    assert(isinstance(relatorio.popula_relatorio(), RelatorioFilho))
@@ -0,0 +1,48 @@
+from pathlib import Path
+from io import StringIO
+import pytest
+
+from COVID19_ES_Py import LeitorRelatorio, exceptions
+from COVID19_ES_Py.relatorio import Caso, CasoDeprecated
+from COVID19_ES_Py.utils import le_linhas_csv
+
+
+def test_success():
+    linhas = le_linhas_csv(Path("tests/relatorios_passados/30-04-2020.csv"))
+    assert len(linhas) == 2688
+    assert linhas[0][:6] == ("2020-04-28", "Confirmados", "Ignorado", "Laboratorial", "Em Aberto", "SANTA TERESA")
+    assert all(len(linha) == 27 for linha in linhas)
+    # Valores repetidos compartilham o mesmo objeto
+    assert linhas[0][1] is linhas[1][1]
+
+    # Arquivo separado por vírgulas e com uma linha vazia
+    linhas = le_linhas_csv(Path("tests/relatorios_passados/16-04-2020.csv"))
+    assert len(linhas) == 6327
+    assert linhas[0][:4] == ("2020-03-24", "Caso Suspeito", "Cura", "ATILIO VIVACQUA")
+
+    linhas = le_linhas_csv(StringIO("Data;Municipio\n17/04/2020;SERRA\n18/04/2020;VITORIA\n"))
+    assert linhas == [("17/04/2020", "SERRA"), ("18/04/2020", "VITORIA")]
+
+    assert le_linhas_csv(StringIO("")) == []
+
+    # Cabeçalho com as colunas de agregação nos índices esperados
+    caminho = Path("tests/relatorios_passados/30-04-2020.csv")
+    assert le_linhas_csv(caminho, colunasAgregacao=CasoDeprecated.colunas_agregacao) == le_linhas_csv(caminho)
+
+
+def test_fail():
+    # Em 16/04/2020 a coluna 5 é RacaCor, não Municipio
+    caminho = Path("tests/relatorios_passados/16-04-2020.csv")
+    with pytest.raises(exceptions.RelatorioError):
+        le_linhas_csv(caminho, colunasAgregacao=CasoDeprecated.colunas_agregacao)
+    with pytest.raises(exceptions.RelatorioError):
+        LeitorRelatorio(caminho)
+
+    # Formato antigo lido como formato atual
+    with pytest.raises(exceptions.RelatorioError):
+        le_linhas_csv(Path("tests/relatorios_passados/30-04-2020.csv"), colunasAgregacao=Caso.colunas_agregacao)
+
+    # Cabeçalho com menos colunas que os índices lidos
+    with pytest.raises(exceptions.RelatorioError):
+        le_linhas_csv(StringIO("Data;Classificacao\n17/04/2020;Confirmados\n"),
+                      colunasAgregacao=CasoDeprecated.colunas_agregacao)
@@ -0,0 +1,20 @@
+import pytest
+
+from COVID19_ES_Py.utils import normaliza_municipio
+
+
+def test_success():
+    assert normaliza_municipio("Vitória") == "VITORIA"
+    assert normaliza_municipio("  santa teresa ") == "SANTA TERESA"
+    assert normaliza_municipio("São José do Calçado") == "SAO JOSE DO CALCADO"
+    assert normaliza_municipio("GUAÇUÍ") == "GUACUI"
+    assert normaliza_municipio("") == ""
+
+
+def test_fail():
+    with pytest.raises(TypeError):
+        normaliza_municipio(1)
+    with pytest.raises(TypeError):
+        normaliza_municipio(None)
+    with pytest.raises(TypeError):
+        normaliza_municipio(["Vitória"])
@@ -0,0 +1,16 @@
+from datetime import date
+
+from COVID19_ES_Py.utils import prioriza_formato_data, FORMATOS_DATA
+
+
+def test_success():
+    assert prioriza_formato_data("24/04/2020") == FORMATOS_DATA
+    assert prioriza_formato_data("2020-04-24")[0] == "YYYY-MM-DD"
+    assert prioriza_formato_data("24.04.2020")[0] == "DD.MM.YYYY"
+    assert sorted(prioriza_formato_data("24042020")) == sorted(FORMATOS_DATA)
+    assert prioriza_formato_data("2020/04/24", ("DD/MM/YYYY", "YYYY/MM/DD")) == ("YYYY/MM/DD", "DD/MM/YYYY")
+
+    # Sem formato compatível, a ordem original é mantida
+    assert prioriza_formato_data("abc") == FORMATOS_DATA
+    assert prioriza_formato_data(date(2020, 4, 24)) == FORMATOS_DATA
+    assert prioriza_formato_data(None) == FORMATOS_DATA